@@ -0,0 +1,422 @@
+'''
+Benchmarks of the property machinery and the PySide bindings.
+
+Run with `python -m pyvvm.bench`; see `--help`.
+
+Results can be saved as JSON (`-o results.json`) and compared against
+an earlier run (`--compare baseline.json`); the exit status is 1 when
+something got slower than `--threshold` allows.
+
+All figures are "lower is better": nanoseconds per operation,
+bytes per instance, or bytes of memory growth. Memory growth is checked
+against an absolute bound instead (see LIMITS); the exit status is 1
+when it's exceeded, baseline or not.
+
+The memory benchmarks need `tracemalloc` (Python 3.4+) and are skipped
+without it. The PySide benchmarks are skipped if PySide isn't available.
+They set QT_QPA_PLATFORM=offscreen, but only Qt 5 honours that;
+PySide (Qt 4) needs a display, so run it under `xvfb-run` when headless.
+'''
+from __future__ import print_function
+
+import argparse
+import functools
+import gc
+import itertools
+import json
+import operator
+import os
+import platform
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python < 3.4
+    tracemalloc = None
+
+from pyvvm import property as p, sync
+
+
+BENCHMARKS = []
+
+# Scales the number of iterations; see --quick
+SCALE = 1.0
+
+# Absolute bounds: name -> (bound, verdict within, verdict over)
+LIMITS = {
+    'soak/memory growth': (64 * 1024, 'flat', 'LEAKING'),
+}
+
+
+def benchmark(func):
+    '''Register a benchmark: a function yielding (name, value, unit) triples.'''
+    BENCHMARKS.append(func)
+    return func
+
+
+def per_op(func, number=200000, repeat=3):
+    '''Best time of `func()`, in nanoseconds per call.'''
+    number = max(int(number * SCALE), 1)
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+def per_instance(make, count=10000):
+    '''Memory taken by one object built with `make()`, in bytes.'''
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [make() for _ in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del objects
+    return float(after - before) / count
+
+
+class Listener(object):
+    def __call__(self, *args, **kwargs):
+        pass
+
+
+def descriptor_case():
+
+    class Model(object):
+        _events = None
+
+        def __init__(self):
+            self._plain = self._conv = self._meth = self._cn = 0
+            self._model = self
+
+        plain = p.property_a('_plain')
+        conv = p.property_a('_conv', show=str, read=int)
+        meth = p.property_a('_meth')
+        cn = p.property_a('_cn', cn=True)
+        model = p.Property(p.ModelField('_plain', '_model'))
+        path = p.Property(p.PathField('_model._plain'))
+
+        @meth('show')
+        def show_meth(self, value):
+            return value
+
+        @meth('read')
+        def read_meth(self, value):
+            return value
+
+    return Model
+
+
+@benchmark
+def descriptors():
+    Model = descriptor_case()
+    obj = Model()
+    # Alternate values, so that every set is a change
+    values = functools.partial(next, itertools.cycle((1, 2)))
+
+    for name in ('plain', 'conv', 'meth', 'cn', 'model', 'path'):
+        prop = getattr(Model, name)
+        get = operator.attrgetter(name)
+        same = get(obj)
+        yield 'get/' + name, per_op(lambda: get(obj)), 'ns'
+        yield 'set/' + name + '/same', per_op(lambda: prop.__set__(obj, same)), 'ns'
+        yield 'set/' + name + '/changed', per_op(lambda: prop.__set__(obj, values())), 'ns'
+
+    # The same class, with and without the layout picked by the `model` decorator
+    for decorate in (False, True):
+        Decl = type('Decl', (object,), {
+            '_cn': 0, 'cn': p.Property(p.Field('_cn'), p.EventStorage('cn'))})
+        if decorate:
+            Decl = p.model(Decl)
+        decl = Decl()
+        yield 'set/cn {0}/changed'.format('model' if decorate else 'undecorated'), \
+            per_op(lambda: Decl.cn.__set__(decl, values())), 'ns'
+
+    listener = Listener()
+    Model.cn.subscribe(obj, listener)
+    yield 'set/cn/changed/1 listener', per_op(lambda: Model.cn.__set__(obj, values())), 'ns'
+
+    def churn():
+        Model.cn.subscribe(obj, listener)
+        Model.cn.unsubscribe(obj, listener)
+    yield 'subscribe+unsubscribe', per_op(churn), 'ns'
+
+
+@benchmark
+def fanout():
+
+    class Model(object):
+        _foo = 0
+        foo = p.property_a('_foo', cn=True)
+
+    for count in (1, 10, 100, 1000, 10000):
+        obj = Model()
+        listeners = [Listener() for _ in range(count)]
+        for listener in listeners:
+            Model.foo.subscribe(obj, listener)
+        yield 'notify/{0} listeners'.format(count), \
+            per_op(lambda: Model.foo.notify(obj), number=max(200000 // count, 10)), 'ns'
+
+
+@benchmark
+def memory():
+    if tracemalloc is None:
+        return
+    Model = descriptor_case()
+    listener = Listener()
+
+    def subscribed():
+        obj = Model()
+        Model.cn.subscribe(obj, listener)
+        return obj
+
+    def linked():
+        obj = Model()
+        obj.path
+        return obj
+
+    yield 'memory/plain', per_instance(Model), 'bytes'
+    yield 'memory/1 listener', per_instance(subscribed), 'bytes'
+    yield 'memory/path link', per_instance(linked), 'bytes'
+
+
+@benchmark
+def links():
+
+    class Model(object):
+        _foo = 0
+        foo = p.property_a('_foo', cn=True)
+
+    values = functools.partial(next, itertools.cycle((1, 2)))
+    for count in (1, 10, 100, 1000):
+        for two_way in (False, True):
+            source = Model()
+            sync.link(source, Model.foo, [(Model(), Model.foo) for _ in range(count)],
+                      two_way=two_way)
+            yield 'link/{0} targets/{1}'.format(count, 'two-way' if two_way else 'one-way'), \
+                per_op(lambda: Model.foo.__set__(source, values()),
+                       number=max(200000 // count, 10)), 'ns'
+
+
+def path_case(depth, cn):
+    '''
+    A view-model reaching `depth` hops down a chain of models:
+    `vm.next.next....value`, where `next` is either a plain attribute
+    or a change-notifying property backed by `_next`.
+    '''
+
+    class Node(object):
+        _events = None
+        value = 0
+        if cn:
+            next = p.property_a('_next', cn=True)
+
+        def __init__(self, next=None):
+            self._next = next
+            if not cn:
+                self.next = next
+
+    path = '.'.join(['next'] * (depth - 1) + ['value'])
+
+    class ViewModel(Node):
+        leaf = p.property_a(path)
+
+    node = Node()
+    for _ in range(depth - 2):
+        node = Node(node)
+    return ViewModel(node), operator.attrgetter('.'.join(['_next'] * (depth - 1) + ['value']))
+
+
+@benchmark
+def paths():
+    for cn in (False, True):
+        for depth in (3, 4, 5):
+            vm, by_hand = path_case(depth, cn)
+            leaf = type(vm).leaf
+            name = 'path/{0} hops/{1}'.format(depth, 'observable' if cn else 'plain')
+            yield name + '/by hand', per_op(lambda: by_hand(vm)), 'ns'
+            yield name + '/get', per_op(lambda: vm.leaf), 'ns'
+            yield name + '/set', per_op(lambda: leaf.__set__(vm, 1)), 'ns'
+
+
+def soak(cycles=1000000, fanout=10, samples=20):
+    '''
+    Churn subscribe/notify/collect cycles on a long-lived model and on
+    short-lived ones. Returns the traced memory (in bytes) sampled along the way.
+    '''
+
+    class Model(object):
+        _foo = 0
+        foo = p.property_a('_foo', cn=True)
+
+    model = Model()
+    rounds = cycles // fanout
+    every = max(rounds // samples, 1)
+    memory = []
+
+    tracemalloc.start()
+    try:
+        for i in range(rounds):
+            transient = Model()
+            listeners = [Listener() for _ in range(fanout)]
+            for listener in listeners:
+                Model.foo.subscribe(model, listener)
+                Model.foo.subscribe(transient, listener)
+            model.foo = transient.foo = i
+            del listeners, transient
+            if i % every == 0:
+                gc.collect()
+                memory.append(tracemalloc.get_traced_memory()[0])
+    finally:
+        tracemalloc.stop()
+    return memory
+
+
+@benchmark
+def soak_memory():
+    if tracemalloc is None:
+        return
+    cycles = max(int(1000000 * SCALE), 1000)
+    start = timeit.default_timer()
+    memory = soak(cycles)
+    elapsed = timeit.default_timer() - start
+    # The first sample is taken before anything got warmed up
+    yield 'soak/ns per cycle', elapsed / cycles * 1e9, 'ns'
+    yield 'soak/memory growth', max(memory[1:]) - memory[1], 'bytes'
+
+
+@benchmark
+def bindings():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+        from PySide import QtGui
+    except ImportError:
+        return
+    from pyvvm import demoutil, pyside
+
+    app = QtGui.QApplication.instance() or QtGui.QApplication([])
+
+    for count in (10, 100, 1000):
+        attrs = {'_events': None}
+        for i in range(count):
+            attrs['text{0}'.format(i)] = p.property_a('_text{0}'.format(i), cn=True)
+            attrs['_text{0}'.format(i)] = 'text'
+            attrs['check{0}'.format(i)] = p.property_a('_check{0}'.format(i), cn=True)
+            attrs['_check{0}'.format(i)] = False
+        Model = type('Model', (object,), attrs)
+        first, second = Model(), Model()
+
+        def window():
+            elements = []
+            for i in range(count):
+                elements.append(('text{0}'.format(i), QtGui.QLineEdit()))
+                elements.append(('check{0}'.format(i), QtGui.QCheckBox()))
+            return demoutil.make_window(elements)
+
+        name = 'hookup/{0} widgets'.format(2 * count)
+        timings = {'hookup_all': [], 'rebind': [], 'unbind': []}
+
+        def timed(key, func, *args):
+            start = timeit.default_timer()
+            result = func(*args)
+            timings[key].append(timeit.default_timer() - start)
+            return result
+
+        # Best of a few fresh windows, like per_op
+        for _ in range(5):
+            view = window()
+            bound = timed('hookup_all', pyside.hookup_all, first, view)
+            timed('rebind', bound.rebind, second)
+            timed('unbind', bound.unbind)
+            view.deleteLater()
+        for key in ('hookup_all', 'rebind', 'unbind'):
+            yield name + '/' + key, min(timings[key]) * 1e9, 'ns'
+
+        view = window()
+        bound = pyside.hookup_all(second, view)
+        yield name + '/model change', \
+            per_op(lambda: setattr(second, 'text0', 'x' if second.text0 != 'x' else 'y'),
+                   number=10000), 'ns'
+        bound.unbind()
+        view.deleteLater()
+    app.processEvents()
+
+
+def run(selected=None):
+    results = {}
+    for func in BENCHMARKS:
+        if selected and func.__name__ not in selected:
+            continue
+        for name, value, unit in func() or ():
+            results[name] = {'value': value, 'unit': unit}
+            verdict = ''
+            if name in LIMITS:
+                bound, within, over = LIMITS[name]
+                verdict = '  ({0})'.format(within if value <= bound else over)
+            print('{0:<45} {1:>14.1f} {2}{3}'.format(name, value, unit, verdict))
+    return results
+
+
+def over_limits(results):
+    '''Names of the results beyond their LIMITS bound.'''
+    return [name for name, (bound, _, _) in sorted(LIMITS.items())
+            if name in results and results[name]['value'] > bound]
+
+
+def compare(results, baseline, threshold):
+    '''Print the changes against a baseline; returns the names that got worse.'''
+    worse = []
+    for name in sorted(set(results) & set(baseline)):
+        old, new = baseline[name]['value'], results[name]['value']
+        # Bounded results are checked on their own, not against a baseline
+        if name in LIMITS or old <= 0:
+            continue
+        ratio = new / old
+        flag = ''
+        if ratio > threshold:
+            flag = '  REGRESSION'
+            worse.append(name)
+        print('{0:<45} {1:>6.2f}x{2}'.format(name, ratio, flag))
+    return worse
+
+
+def main(argv=None):
+    global SCALE
+
+    parser = argparse.ArgumentParser(prog='python -m pyvvm.bench')
+    parser.add_argument('benchmarks', nargs='*',
+                        help='run only these ({0})'.format(', '.join(f.__name__ for f in BENCHMARKS)))
+    parser.add_argument('-o', '--output', help='save the results to a JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare with a saved JSON file')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='slowdown ratio counted as a regression (default: %(default)s)')
+    parser.add_argument('--quick', action='store_true', help='a tenth of the iterations')
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        SCALE = 0.1
+
+    results = run(args.benchmarks)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'platform': platform.platform(),
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+
+    status = 1 if over_limits(results) else 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        print()
+        if compare(results, baseline, args.threshold):
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
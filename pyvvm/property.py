@@ -1,3 +1,6 @@
+import collections
+import itertools
+import operator
 import weakref
 
 def identity(x):
@@ -6,17 +9,23 @@ def identity(x):
 # TODO what about hooking up custom storage easily, like property(**foo)?
 # TODO and .getter, .setter, .deleter?
 
+# Creation order of properties; keeps the class tables ordered on Python 2
+_creation_order = itertools.count()
+
 class Property(object):
     '''An extended property object that supports interesting stuff.
 
     Property(storage, **kwargs) -> extended property object 
 
     Arguments:
-    - storage (required):
+    - storage (default: Field()):
         An object that describes where to keep this property's value.
+        Storage objects created without a name get it from the property
+        (`Field()` on property `foo` becomes `Field('_foo')`).
         Examples:
         - `Field(name) - a backing field in same object (`.name`)
         - `ModelField(name, model) - a field in another object (`.model.name`)
+        - `PathField(path) - a field down a chain of objects (`.a.b.name`)
 
     - event_storage (default: None)
         Where to keep this object's event jar (see `storage`).
@@ -32,13 +41,25 @@ class Property(object):
 
     '''
 
-    def __init__(self, storage, event_storage=None, read=identity, show=identity):
-        self._storage = storage
+    name = None
+
+    def __init__(self, storage=None, event_storage=None, read=identity, show=identity):
+        self._storage = storage if storage is not None else Field()
+        self._order = next(_creation_order)
         self._event_storage = event_storage
         self._read, self._show = read, show
         # Provide the `subscribe` method only if there's storage for the events
         if event_storage is not None:
             self.subscribe = self._subscribe
+            self.unsubscribe = self._unsubscribe
+
+    def __set_name__(self, owner, name):
+        # Called by `type` on Python 3.6+, and by `class_info` otherwise
+        self.name = name
+        for storage in (self._storage, self._event_storage):
+            set_name = getattr(storage, '__set_name__', None)
+            if set_name is not None:
+                set_name(owner, name)
 
     def __get__(self, obj, type=None):
         if obj is None:
@@ -51,7 +72,8 @@ class Property(object):
         value_prev = self._storage[obj]
         if value != value_prev:
             self._storage[obj] = value
-            self.notify(obj)
+            if self._event_storage is not None:
+                self.notify(obj)
 
     def __delete__(self, obj):
         del self._storage[obj]
@@ -65,16 +87,33 @@ class Property(object):
             # Return silently; there are no listeners anyway
             return
 
-        for cb in self._event_storage[obj] or ():
-            cb(*args, **kwargs)
+        event = self._event_storage[obj]
+        if event is None:
+            return
+        # The snapshot is immutable; callbacks may (un)subscribe freely
+        for ref in event.snapshot():
+            cb = ref()
+            if cb is not None:
+                cb(*args, **kwargs)
 
     def _subscribe(self, obj, cb):
         assert self._event_storage
         if self._event_storage[obj] is None:
             # Prepare a default event
-            self._event_storage[obj] = weakref.WeakSet()
+            self._event_storage[obj] = Event()
+            # Storage that can observe its own backing (see PathField)
+            # gets to ring the listeners too
+            watch = getattr(self._storage, 'watch', None)
+            if watch is not None:
+                watch(obj, self.notify)
         self._event_storage[obj].add(cb)
 
+    def _unsubscribe(self, obj, cb):
+        assert self._event_storage
+        event = self._event_storage[obj]
+        if event is not None:
+            event.discard(cb)
+
     def __call__(self, name):
         '''
         Intended to be used with decorator syntax. 
@@ -117,12 +156,18 @@ class Property(object):
     _mshow = None
 
 
-def property_a(name, model=None, cn=False, **kwargs):
+def property_a(name=None, model=None, cn=False, **kwargs):
     # WHAT SHOULD THE DEFAULT BE?
-    if model is None:
-        storage = Field(name)
-    else:
+    # Without a name, the storage is named after the property,
+    # see Property.__set_name__
+    if model is not None and '.' not in model:
         storage = ModelField(name, model)
+    elif model is not None:
+        storage = PathField('{0}.{1}'.format(model, name or ''))
+    elif name is not None and '.' in name:
+        storage = PathField(name)
+    else:
+        storage = Field(name)
     if cn:
         event_storage = EventStorage(name)
     else:
@@ -132,9 +177,13 @@ def property_a(name, model=None, cn=False, **kwargs):
 
 class Field(object):
 
-    def __init__(self, name):
+    def __init__(self, name=None):
         self.name = name
 
+    def __set_name__(self, owner, name):
+        if self.name is None:
+            self.name = '_' + name
+
     def __getitem__(self, object):
         return getattr(object, self.name)
 
@@ -151,6 +200,10 @@ class ModelField(object):
         self.name = name
         self.modelname = modelname
 
+    def __set_name__(self, owner, name):
+        if self.name is None:
+            self.name = name
+
     def __getitem__(self, object):
         return getattr(getattr(object, self.modelname), self.name)
 
@@ -160,13 +213,171 @@ class ModelField(object):
     def __delitem__(self, object):
         delattr(getattr(object, self.modelname), self.name)
 
+class PathField(object):
+    '''A field down a chain of objects.
+
+    PathField('customer.address.city') keeps the value in `.customer.address.city`.
+
+    The path is compiled once to an `attrgetter`. Every hop that is itself
+    a change-notifying property gets subscribed, so replacing
+    an intermediate object (say, `.customer`) rebinds the path
+    and rings the listeners of the property using this storage.
+    If all the hops are like that, the leaf target is also cached
+    until one of them changes; otherwise it's resolved on every access.
+    The first hop is also compared by identity on every access, so
+    the cache survives editing the object's own backing fields directly.
+    Deeper hops rely on their change notification.
+
+    A path ending with a dot (`'customer.address.'`) gets
+    the leaf named after the property.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.name = None
+        if not path.endswith('.'):
+            self._compile(path)
+
+    def __set_name__(self, owner, name):
+        if self.name is None:
+            self._compile(self.path + name)
+
+    def _compile(self, path):
+        self.path = path
+        hops = path.split('.')
+        self.name = hops.pop()
+        self.hops = hops
+        # Not a valid identifier, and can't clash with another path's
+        self.linkname = '_path_{0}'.format(path)
+        self._resolve = operator.attrgetter('.'.join(hops)) if hops else identity
+
+    def __getitem__(self, object):
+        return getattr(self._target(object)[1], self.name)
+
+    def __setitem__(self, object, value):
+        link, target = self._target(object)
+        # The caller notifies about this change itself;
+        # don't echo it back from the leaf's own notification
+        link.muted = True
+        try:
+            setattr(target, self.name, value)
+        finally:
+            link.muted = False
+
+    def __delitem__(self, object):
+        delattr(self._target(object)[1], self.name)
+
+    def watch(self, object, cb):
+        '''
+        watch(object, cb) -- call `cb(object)` whenever something along the path changes
+        '''
+        watchers = self._link(object).watchers
+        if cb not in watchers:
+            watchers.append(cb)
+
+    def _target(self, object):
+        link = self._link(object)
+        if link.cached:
+            if link.get_head(object) is link.head:
+                return link, link.target
+            link.changed(object)
+            if link.cached:
+                return link, link.target
+        return link, self._resolve(object)
+
+    def _link(self, object):
+        link = getattr(object, self.linkname, None)
+        if link is None:
+            link = _PathLink(self, object)
+            setattr(object, self.linkname, link)
+        return link
+
+
+class _PathLink(object):
+    '''Per-object state of a PathField: the resolved target and the hop subscriptions.'''
+
+    def __init__(self, field, owner):
+        self.field = field
+        self.owner = weakref.ref(owner)
+        self.watchers = []
+        self.muted = False
+        self.rebind(owner)
+
+    def rebind(self, owner):
+        # Dropping the previous hooks is enough to unsubscribe them,
+        # the event jars only keep weak references
+        self.hooks = []
+        model, cached = owner, bool(self.field.hops)
+        if cached:
+            self.get_head = _head_getter(type(owner), self.field.hops[0])
+            self.head = self.get_head(owner)
+        for name in self.field.hops:
+            cached = self._hook(model, name, _PathLink._hop_changed) and cached
+            model = getattr(model, name, None)
+            if model is None:
+                cached = False
+                break
+        else:
+            self._hook(model, self.field.name, _PathLink._leaf_changed)
+        self.target = model
+        self.cached = cached
+
+    def _hook(self, model, name, callback):
+        subscribe = getattr(getattr(type(model), name, None), 'subscribe', None)
+        if subscribe is None:
+            return False
+        # Only a weak reference back, so the link isn't part of a cycle
+        linkref = weakref.ref(self)
+        def hook(*args, **kwargs):
+            link = linkref()
+            if link is not None:
+                callback(link)
+        self.hooks.append(hook)
+        subscribe(model, hook)
+        return True
+
+    def changed(self, owner):
+        self.rebind(owner)
+        self._fire(owner)
+
+    def _hop_changed(self):
+        owner = self.owner()
+        if owner is not None:
+            self.changed(owner)
+
+    def _leaf_changed(self):
+        owner = self.owner()
+        if owner is not None and not self.muted:
+            self._fire(owner)
+
+    def _fire(self, owner):
+        # The watchers get the owner from here, so that the link
+        # (kept on the owner) doesn't hold the owner itself
+        for cb in list(self.watchers):
+            cb(owner)
+
+
+def _head_getter(cls, name):
+    # Peek at a plain backing field directly, it's much cheaper than the property
+    storage = getattr(getattr(cls, name, None), '_storage', None)
+    if type(storage) is Field:
+        name = storage.name
+    return operator.attrgetter(name)
+
+
 class EventStorage(object):
 
     # TODO revamp to use one dict
 
-    def __init__(self, name):
+    def __init__(self, name=None):
         self.name = name
-        self.propname = '_events_{0}'.format(name)
+        if name is not None:
+            self.propname = '_events_{0}'.format(name)
+
+    def __set_name__(self, owner, name):
+        if self.name is None:
+            self.name = name
+            self.propname = '_events_{0}'.format(name)
 
     def __getitem__(self, object):
         return getattr(object, self.propname, None)
@@ -175,4 +386,155 @@ class EventStorage(object):
         setattr(object, self.propname, value)
 
     def __delitem__(self, object):
-        delattr(object, self.name)
+        delattr(object, self.propname)
+
+
+class Event(object):
+    '''An event jar; a set of weakly referenced callbacks.
+
+    Notification iterates `snapshot()`, a tuple that is only rebuilt
+    after the set changes, so subscribing or unsubscribing from
+    a callback takes effect from the next notification.
+    Dead references are dropped from the set right away, but stay in
+    the snapshot (and are skipped) until they make up half of it.
+    '''
+
+    __slots__ = ('_refs', '_snapshot', '_dead', '_remove', '__weakref__')
+
+    def __init__(self):
+        self._refs = {}
+        self._snapshot = None
+        self._dead = 0
+        def remove(ref, selfref=weakref.ref(self)):
+            self = selfref()
+            if self is not None:
+                self._discard_ref(ref)
+        self._remove = remove
+
+    def add(self, cb):
+        ref = weakref.ref(cb, self._remove)
+        if ref not in self._refs:
+            self._refs[ref] = None
+            self._snapshot = None
+
+    def discard(self, cb):
+        try:
+            ref = weakref.ref(cb)
+        except TypeError:
+            return
+        if self._refs.pop(ref, self) is not self:
+            self._snapshot = None
+
+    def _discard_ref(self, ref):
+        self._refs.pop(ref, None)
+        snapshot = self._snapshot
+        if snapshot is not None:
+            self._dead += 1
+            if self._dead * 2 > len(snapshot):
+                self._snapshot = None
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._snapshot = tuple(self._refs)
+            self._dead = 0
+        return snapshot
+
+    def __iter__(self):
+        for ref in self.snapshot():
+            cb = ref()
+            if cb is not None:
+                yield cb
+
+    def __len__(self):
+        return len(self._refs)
+
+
+class ClassInfo(object):
+    '''Per-class metadata of a model. See `class_info`.
+
+    - properties: an ordered dict of name -> Property, in declaration order
+    - members: names of all the class attributes, for matching up views
+    '''
+
+    def __init__(self, cls):
+        found = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, Property):
+                    found[name] = value
+                else:
+                    found.pop(name, None)
+        for name, prop in found.items():
+            if prop.name is None:
+                prop.__set_name__(cls, name)
+        self.properties = collections.OrderedDict(
+            sorted(found.items(), key=lambda item: item[1]._order))
+        self.members = frozenset(dir(cls))
+
+
+# Tables of the classes not decorated with `model`
+_class_infos = weakref.WeakKeyDictionary()
+
+
+def class_info(cls, refresh=False):
+    '''
+    class_info(cls, refresh=False) -> ClassInfo for the class
+
+    Computed on first use and kept for the class, so class attributes
+    reassigned afterwards aren't picked up unless `refresh` is given.
+    Classes decorated with `model` keep theirs from class creation on, refresh or not.
+    '''
+    info = cls.__dict__.get('_class_info')
+    if info is not None:
+        return info
+    info = None if refresh else _class_infos.get(cls)
+    if info is None:
+        info = _class_infos[cls] = ClassInfo(cls)
+    return info
+
+
+def model(cls):
+    '''
+    Class decorator; makes a declarative model class.
+
+    Collects the class's properties upfront and keeps the table for `class_info`.
+    Picks the storage layout:
+    - automatically named backing fields are named after the property (`foo` -> `._foo`),
+    - the event jar attributes get a `None` default on the class, so
+      objects nobody has subscribed to find it there instead of
+      going through a failed attribute lookup on every change.
+
+    Needed on Python 2 for properties without an explicit storage name,
+    as there's no `__set_name__` there.
+    '''
+    info = ClassInfo(cls)
+    for prop in info.properties.values():
+        events = prop._event_storage
+        if isinstance(events, EventStorage) and not hasattr(cls, events.propname):
+            setattr(cls, events.propname, None)
+    setattr(cls, '_class_info', info)
+    return cls
+
+
+def snapshot(obj):
+    '''
+    snapshot(obj) -> dict of the stored values of all the object's properties
+    '''
+    info = class_info(type(obj))
+    return dict((name, prop._storage[obj]) for name, prop in info.properties.items())
+
+
+def restore(obj, values):
+    '''
+    restore(obj, values) -- put back stored values taken with `snapshot`
+
+    Converters are bypassed, as the values are already in the stored form.
+    Listeners of the properties that change get notified.
+    '''
+    properties = class_info(type(obj)).properties
+    for name, value in values.items():
+        prop = properties[name]
+        if value != prop._storage[obj]:
+            prop._storage[obj] = value
+            prop.notify(obj)
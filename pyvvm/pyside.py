@@ -1,4 +1,5 @@
 from PySide import QtGui, QtCore
+from pyvvm.property import class_info
 
 import logging
 logger = logging.getLogger(__name__)
@@ -20,19 +21,152 @@ class Listener(QtCore.QObject):
         self.callback(*args, **kwargs)
 
 
-def hookup(model, control):
+class Binding(object):
+    '''
+    A link between a property of a model and a control, as made by `hookup`.
+
+    Can be suspended (changes on either side are ignored,
+    the view catches up on resume), moved to another model,
+    or undone altogether.
+
+    Properties without an `unsubscribe` method are let go of
+    by releasing the listener; that relies on them keeping
+    their subscribers weakly, as `Event` does.
+    '''
+
+    def __init__(self, control, model, property):
+        self.control = control
+        self.model = model
+        self.property = property
+        self.active = True
+        self.dirty = False
+        self.update_view = None
+        self._connections = []
+        self._listener = None
+
+    def connect(self, signal, callback):
+        '''Connect a signal of the control; ignored while suspended.'''
+        def changed(*args):
+            if self.active:
+                callback(*args)
+        listener = Listener(self.control, changed)
+        signal.connect(listener)
+        self._connections.append((signal, listener))
+
+    def watch(self, update_view):
+        '''Refresh the view now and whenever the property changes.'''
+        self.update_view = update_view
+        if hasattr(self.property, 'subscribe'):
+            self._subscribe()
+        self.refresh()
+
+    def _subscribe(self):
+        self._listener = Listener(self.control, self.refresh)
+        self.property.subscribe(self.model, self._listener)
+
+    def _unsubscribe(self):
+        unsubscribe = getattr(self.property, 'unsubscribe', None)
+        if unsubscribe is not None:
+            unsubscribe(self.model, self._listener)
+        self._listener.setParent(None)
+        self._listener = None
+
+    def refresh(self):
+        if self.update_view is None:
+            return
+        if self.active:
+            self.dirty = False
+            self.update_view()
+        else:
+            self.dirty = True
+
+    def suspend(self):
+        self.active = False
+
+    def resume(self):
+        self.active = True
+        if self.dirty:
+            self.refresh()
+
+    def rebind(self, model, refresh=True):
+        '''Move the binding to another model with the same property.'''
+        subscribed = self._listener is not None
+        if subscribed:
+            self._unsubscribe()
+        self.model = model
+        if subscribed:
+            self._subscribe()
+        if refresh:
+            self.refresh()
+
+    def unbind(self):
+        for signal, listener in self._connections:
+            signal.disconnect(listener)
+            listener.setParent(None)
+        self._connections = []
+        if self._listener is not None:
+            self._unsubscribe()
+        self.update_view = None
+
+
+class BindingSet(object):
+    '''
+    All the bindings made by `hookup_all`; lets a dialog be
+    unbound, suspended while hidden, or reused for another model.
+    '''
+
+    def __init__(self, model, bindings):
+        self.model = model
+        self.bindings = bindings
+
+    def __iter__(self):
+        return iter(self.bindings)
+
+    def __len__(self):
+        return len(self.bindings)
+
+    def suspend(self):
+        for binding in self.bindings:
+            binding.suspend()
+
+    def resume(self):
+        for binding in self.bindings:
+            binding.resume()
+
+    def rebind(self, model):
+        '''
+        rebind(model) -- point the same controls at another model of the same class
+        '''
+        if type(model) is not type(self.model):
+            raise TypeError('Cannot rebind {0} bindings to {1}'.format(
+                type(self.model).__name__, type(model).__name__))
+        for binding in self.bindings:
+            binding.rebind(model, refresh=False)
+        self.model = model
+        # One refresh pass, once every binding points at the new model
+        for binding in self.bindings:
+            binding.refresh()
+
+    def unbind(self):
+        for binding in self.bindings:
+            binding.unbind()
+        self.bindings = []
+
+
+def hookup(model, control, field_property=None):
     field_name = control.objectName()
 
     # Combo box hack - allow the value to be encoded in the combo box
     # field_name, _, field_value = field_name.partition('__')
     
-    field_property = getattr(type(model), field_name)
+    if field_property is None:
+        field_property = getattr(type(model), field_name)
 
     if isinstance(control, QtGui.QCheckBox):
-        hookQCheckBox(control, model, field_property)
+        return hookQCheckBox(control, model, field_property)
 
     elif isinstance(control, QtGui.QPushButton):
-        hookQPushButton(control, model, field_property)
+        return hookQPushButton(control, model, field_property)
 
     #elif isinstance(control, QtGui.QDialogButtonBox):
     #    hookQDialogButtonBox(control, getattr(model, field_name))
@@ -41,7 +175,7 @@ def hookup(model, control):
     #    hookQRadioButton(control, field_value, **field(model, field_name))
 
     elif isinstance(control, QtGui.QLineEdit):
-        hookQLineEdit(control, model, field_property)
+        return hookQLineEdit(control, model, field_property)
 
     # elif isinstance(control, QtGui.QSpinBox):       
     #    hookQSpinBox(control, **field(model, field_name))
@@ -57,14 +191,26 @@ def hookup(model, control):
 
 
 def hookup_all(model, ui):
+    '''
+    hookup_all(model, ui) -> BindingSet
+
+    Hooks up every child control of `ui` named after a member of the model.
+
+    The members are taken from `class_info`, refreshed on every call;
+    for `@model` classes that's the table made at class creation,
+    so attributes added later aren't seen.
+    '''
+    info = class_info(type(model), refresh=True)
+    bindings = []
     for control in _all_children(ui):
         field_name = control.objectName()
         if not field_name:
             continue
         if '__' in field_name:
             field_name, _, _ = field_name.partition('__')
-        if hasattr(model, field_name):
-            hookup(model, control)
+        if field_name in info.members:
+            bindings.append(hookup(model, control, info.properties.get(field_name)))
+    return BindingSet(model, bindings)
 
 
 
@@ -84,18 +230,17 @@ def is_enabled(property, model):
         return True
 
 def hookQLineEdit(e, model, property):
+    binding = Binding(e, model, property)
 
     def update_model():
-        property.__set__(model, e.text())
+        property.__set__(binding.model, e.text())
     def update_view():
-        e.setText(property.__get__(model))
-        e.setEnabled(is_enabled(property, model))
-
-    update_view()
+        e.setText(property.__get__(binding.model))
+        e.setEnabled(is_enabled(property, binding.model))
 
-    e.editingFinished.connect(Listener(e, update_model))
-    if hasattr(property, 'subscribe'):
-        property.subscribe(model, Listener(e, update_view))
+    binding.connect(e.editingFinished, update_model)
+    binding.watch(update_view)
+    return binding
 
 
 def hookQComboBox(e, items, initial=-1, cb=None):
@@ -124,17 +269,16 @@ def hookQComboBox2(e, items, initial=None, cb=None, fmt=unicode):
 
 
 def hookQCheckBox(e, model, property):
+    binding = Binding(e, model, property)
 
     def update_model(arg):
-        property.__set__(model, e.isChecked())
+        property.__set__(binding.model, e.isChecked())
     def update_view():
-        e.setChecked(property.__get__(model))
-
-    update_view()
+        e.setChecked(property.__get__(binding.model))
 
-    e.toggled.connect(Listener(e, update_model))
-    if hasattr(property, 'subscribe'):
-        property.subscribe(model, Listener(e, update_view))
+    binding.watch(update_view)
+    binding.connect(e.toggled, update_model)
+    return binding
 
 def makeQSpinBox(parent, range, double=False, decimals=None, step=None, initial=None, cb=None):
     if not double:
@@ -162,15 +306,17 @@ makeQDoubleSpinBox=partial(makeQSpinBox, double=True)
 hookQDoubleSpinBox=partial(hookQSpinBox, double=True)
 
 def hookQPushButton(e, model, property):
+    binding = Binding(e, model, property)
 
     def action():
         # Yeah, look up the actual callback on every click.
         # It might change.
-        property.__get__(model)()
+        property.__get__(binding.model)()
 
     # Change subscription will be useful when handling .enabled()
 
-    e.clicked.connect(Listener(e, action))
+    binding.connect(e.clicked, action)
+    return binding
 
 
 def hookQRadioButton(e, val, initial=None, cb=None):
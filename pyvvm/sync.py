@@ -0,0 +1,176 @@
+'''
+Property to property links; keeps models in sync without any UI in between.
+'''
+from pyvvm.property import identity
+
+# Where a source keeps its links; not an identifier, so it can't clash
+# with anything the model defines
+_LINKS = 'pyvvm.sync:links'
+
+
+class Link(object):
+    '''
+    Mirrors a property of a source model onto properties of target models,
+    as made by `link`.
+
+    Every source change is read and converted once, then set on all the
+    targets in one pass. Two-way links also push target changes back to
+    the source (and from there to the other targets).
+    Changes made by the link itself don't echo back.
+
+    Lives as long as the source does, which needs a `__dict__` to hold it;
+    `unbind()` undoes it.
+    '''
+
+    def __init__(self, source, property, targets, two_way=False,
+                 forward=identity, back=identity, defer=None):
+        try:
+            links = vars(source).setdefault(_LINKS, [])
+        except TypeError:
+            raise TypeError('Cannot link from {0}, it has no __dict__'.format(
+                type(source).__name__))
+        self.source = source
+        self.property = _property(source, property, observed=True)
+        self.targets = [(target, _property(target, prop, observed=two_way))
+                        for target, prop in targets]
+        self.two_way = two_way
+        self.forward, self.back = forward, back
+        self.defer = defer
+        self.active = True
+        self.pending = False
+        self._busy = False
+        # The target changed last while suspended, if any
+        self._changed_target = None
+
+        # The event jars only keep weak references; the link keeps its hooks
+        # and the source keeps the link
+        self._hooks = []
+        self._subscribe(source, self.property, self._source_changed)
+        if two_way:
+            for target, prop in self.targets:
+                self._subscribe(target, prop, self._target_changed(target, prop))
+        links.append(self)
+
+        self.push()
+
+    def _subscribe(self, obj, prop, callback):
+        def hook(*args, **kwargs):
+            callback()
+        self._hooks.append((obj, prop, hook))
+        prop.subscribe(obj, hook)
+
+    def _source_changed(self):
+        if self._busy:
+            return
+        if not self.active:
+            self._changed_target = None
+        if not self.active or self.defer is not None:
+            if not self.pending:
+                self.pending = True
+                if self.active:
+                    self.defer(self.flush)
+            return
+        self.push()
+
+    def _target_changed(self, target, prop):
+        def changed():
+            if self._busy:
+                return
+            if not self.active:
+                self._changed_target = target, prop
+                return
+            self._pull(target, prop)
+        return changed
+
+    def _pull(self, target, prop):
+        value = self.back(prop.__get__(target))
+        self._busy = True
+        try:
+            self.property.__set__(self.source, value)
+        finally:
+            self._busy = False
+        # Bring the other targets along
+        self._source_changed()
+
+    def push(self):
+        '''Set the current (converted) source value on all the targets.'''
+        self.pending = False
+        current = self.property.__get__(self.source)
+        while True:
+            value = self.forward(current)
+            self._busy = True
+            try:
+                for target, prop in self.targets:
+                    prop.__set__(target, value)
+            finally:
+                self._busy = False
+            # The source may have been changed from a target's listener,
+            # which went unnoticed while busy; push that too
+            latest = self.property.__get__(self.source)
+            if latest is current or latest == current:
+                break
+            current = latest
+
+    def flush(self):
+        '''Push the source value if there are coalesced changes waiting.'''
+        if self.pending and self.active:
+            self.push()
+
+    def suspend(self):
+        self.active = False
+
+    def resume(self):
+        '''
+        Catch up with whichever side changed last while suspended:
+        a target's change goes back to the source, a source's to the targets.
+        '''
+        self.active = True
+        changed, self._changed_target = self._changed_target, None
+        if changed is not None:
+            self.pending = False
+            self._pull(*changed)
+        else:
+            self.flush()
+
+    def unbind(self):
+        for obj, prop, hook in self._hooks:
+            prop.unsubscribe(obj, hook)
+        self._hooks = []
+        links = vars(self.source).get(_LINKS, [])
+        if self in links:
+            links.remove(self)
+        self.active = self.pending = False
+        self._changed_target = None
+
+
+def link(source, property, targets, two_way=False, forward=identity, back=identity, defer=None):
+    '''
+    link(source, property, targets, **kwargs) -> Link
+
+    Keeps the property of `source` mirrored on `targets`,
+    a list of (object, property) pairs.
+    Properties can be given as Property objects or by name.
+
+    - two_way (default: False)
+        Also push changes of the targets back to the source.
+        The target properties need change notification too.
+    - forward (default: identity)
+        A callable; how to convert from the source value to the target value.
+    - back (default: identity)
+        A callable; how to convert from a target value to the source value.
+    - defer (default: None)
+        Coalesce source changes: the first change calls `defer(flush)`,
+        and the link waits for that `flush()` to push the latest value.
+        For example `QtCore.QTimer.singleShot` with a 0 timeout bound,
+        or an event loop's `call_soon`.
+    '''
+    return Link(source, property, targets, two_way, forward, back, defer)
+
+
+def _property(obj, property, observed):
+    if not hasattr(property, '__get__'):
+        property = getattr(type(obj), property)
+    if observed and not hasattr(property, 'subscribe'):
+        raise ValueError('Property {0} of {1} has no change notification'.format(
+            getattr(property, 'name', property), type(obj).__name__))
+    return property
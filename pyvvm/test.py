@@ -1,5 +1,6 @@
 import mock
 import pyvvm.property as p
+import pyvvm.sync as s
 
 def test_bf():
     '''Create a property with a backing field'''
@@ -129,3 +130,512 @@ def test_plug_conv():
     read.assert_called_with(a, 20)
 
 
+
+def test_path():
+    '''Reach a field down a chain of models'''
+
+    class Address(object):
+        city = 'Paris'
+
+    class Customer(object):
+        address = Address()
+
+    class A(object):
+
+        city = p.property_a('city', 'customer.address')
+
+    a = A()
+    a.customer = Customer()
+
+    assert a.city == 'Paris'
+    a.city = 'Lyon'
+    assert a.customer.address.city == 'Lyon'
+
+    # Plain attributes along the path are resolved on every access
+    a.customer.address = Address()
+    assert a.city == 'Paris'
+
+def test_path_rebind():
+    '''Replacing a model along the path rebinds and notifies'''
+
+    class Address(object):
+        _events = None
+        city = p.property_a('_city', cn=True)
+
+        def __init__(self, city):
+            self._city = city
+
+    class Customer(object):
+        address = p.property_a('_address', cn=True)
+
+        def __init__(self, city):
+            self._address = Address(city)
+
+    class A(object):
+        customer = p.property_a('_customer', cn=True)
+        city = p.property_a('city', 'customer.address', cn=True)
+
+        def __init__(self):
+            self._customer = Customer('Paris')
+
+    cb = mock.Mock()
+
+    a = A()
+    A.city.subscribe(a, cb)
+    assert a.city == 'Paris'
+
+    a.customer = Customer('Lyon')
+    assert a.city == 'Lyon'
+    assert cb.call_count == 1
+
+    old_address = a.customer.address
+    a.customer.address = Address('Nice')
+    assert a.city == 'Nice'
+    assert cb.call_count == 2
+
+    # The replaced models aren't observed anymore
+    old_address.city = 'Rome'
+    assert cb.call_count == 2
+
+    # Changing the leaf directly on the model gets through too
+    a.customer.address.city = 'Oslo'
+    assert a.city == 'Oslo'
+    assert cb.call_count == 3
+
+    # Setting through the path notifies only once
+    a.city = 'Bern'
+    assert a.customer.address.city == 'Bern'
+    assert cb.call_count == 4
+
+    # Editing the backing field of the first hop is caught too
+    a._customer = Customer('Rome')
+    assert a.city == 'Rome'
+    assert cb.call_count == 5
+
+def test_path_equal_models():
+    '''Models comparing equal don't confuse the cached path'''
+
+    class Address(object):
+        city = p.property_a('_city', cn=True)
+
+        def __init__(self, city):
+            self._city = city
+
+        def __eq__(self, other):
+            return True
+
+        __hash__ = object.__hash__
+
+    class Customer(object):
+        address = p.property_a('_address', cn=True)
+
+        def __init__(self, city):
+            self._address = Address(city)
+
+    class A(object):
+        customer = p.property_a('_customer', cn=True)
+        city = p.property_a('city', 'customer.address', cn=True)
+
+        def __init__(self):
+            self._customer = Customer('Paris')
+
+    a = A()
+    assert a.city == 'Paris'
+
+    a.customer.address = Address('Lyon')
+    assert a.city == a.customer.address.city
+    a._customer._address = Address('Nice')
+    a._customer = Customer('Oslo')
+    assert a.city == 'Oslo'
+    a.city = 'Rome'
+    assert a.customer.address.city == 'Rome'
+
+def test_path_storage():
+    '''Single hops keep using ModelField; paths don't clash or keep their owner alive'''
+
+    import gc
+    import weakref
+
+    class M(object):
+        pass
+
+    class A(object):
+        _events = None
+        one = p.property_a('foo', '_model')
+        ab_c = p.property_a('a_b.c', cn=True)
+        a_bc = p.property_a('a.b_c', cn=True)
+
+    assert isinstance(A.one._storage, p.ModelField)
+    assert isinstance(A.ab_c._storage, p.PathField)
+
+    a = A()
+    a.a_b, a.a = M(), M()
+    a.a_b.c, a.a.b_c = 1, 2
+    A.ab_c.subscribe(a, mock.Mock())
+    assert (a.ab_c, a.a_bc) == (1, 2)
+
+    gc.disable()
+    try:
+        ref = weakref.ref(a)
+        del a
+        assert ref() is None
+    finally:
+        gc.enable()
+
+def test_path_resubscribe():
+    '''A fresh event jar doesn't double the path notifications'''
+
+    class Address(object):
+        city = p.property_a('_city', cn=True)
+
+        def __init__(self, city):
+            self._city = city
+
+    class Customer(object):
+        address = p.property_a('_address', cn=True)
+
+    class A(object):
+        city = p.property_a('_customer.address.city', cn=True)
+
+    a = A()
+    a._customer = Customer()
+    a._customer._address = Address('Paris')
+
+    A.city.subscribe(a, mock.Mock())
+    del A.city._event_storage[a]
+    cb = mock.Mock()
+    A.city.subscribe(a, cb)
+
+    a._customer.address = Address('Lyon')
+    assert cb.call_count == 1
+
+    # The hop hooks don't keep the link in a cycle
+    import gc
+    import weakref
+    gc.disable()
+    try:
+        linkref = weakref.ref(getattr(a, A.city._storage.linkname))
+        del a
+        assert linkref() is None
+    finally:
+        gc.enable()
+
+def test_class_info():
+    '''Properties learn their names; the class keeps an ordered table of them'''
+
+    @p.model
+    class A(object):
+        _events = None
+        _foo = _baz = _qux = None
+        foo = p.property_a(cn=True)
+        bar = p.property_a('_baz')
+
+    @p.model
+    class B(A):
+        qux = p.Property()
+
+        def method(self):
+            pass
+
+    b = B()
+    b.foo = 1
+    b.bar = 2
+    b.qux = 3
+    assert (b._foo, b._baz, b._qux) == (1, 2, 3)
+    assert B.foo.name == 'foo'
+
+    info = p.class_info(B)
+    assert list(info.properties) == ['foo', 'bar', 'qux']
+    assert info.properties['qux'] is B.qux
+    assert 'method' in info.members
+    assert p.class_info(B) is info
+
+    # Other classes get theirs on first use; refresh to see reassignments
+    class C(object):
+        foo = p.property_a('_foo')
+
+    info = p.class_info(C)
+    C.foo = p.property_a('_bar')
+    assert p.class_info(C) is info
+    assert p.class_info(C, refresh=True).properties['foo'] is C.foo
+
+def test_model_layout():
+    '''Declarative models give the event jars a default on the class'''
+
+    @p.model
+    class A(object):
+        _foo = _bar = 0
+        foo = p.property_a(cn=True)
+        bar = p.property_a('_bar', cn=True)
+
+    assert A._events_foo is None
+    assert A._events__bar is None
+
+    a = A()
+    cb = mock.Mock()
+    A.foo.subscribe(a, cb)
+    a.foo = 1
+    a.bar = 2
+    assert cb.call_count == 1
+
+    del A.foo._event_storage[a]
+    assert A.foo._event_storage[a] is None
+    a.foo = 3
+    assert cb.call_count == 1
+
+def test_unnamed_model_field():
+    '''Properties on a backing model can be named after themselves too'''
+
+    class M(object):
+        city = 'Paris'
+
+    @p.model
+    class A(object):
+        city = p.property_a(model='_m')
+        town = p.property_a(model='_a.m')
+
+    a = A()
+    a._m = M()
+    a._a = mock.Mock(m=M())
+    a._a.m.town = 'Lyon'
+    assert a.city == 'Paris'
+    assert a.town == 'Lyon'
+    assert 'city' not in vars(a)
+
+def test_snapshot():
+    '''Take the stored values of a model and put them back'''
+
+    @p.model
+    class A(object):
+        _events = None
+        _foo = _bar = None
+        foo = p.property_a(cn=True, show=str, read=int)
+        bar = p.property_a()
+
+    cb = mock.Mock()
+
+    a = A()
+    a.foo, a.bar = '1', 'b'
+    A.foo.subscribe(a, cb)
+
+    values = p.snapshot(a)
+    assert values == {'foo': 1, 'bar': 'b'}
+
+    a.foo, a.bar = '2', 'c'
+    p.restore(a, values)
+    assert (a.foo, a.bar) == ('1', 'b')
+    assert cb.call_count == 2
+
+def test_notify_mutation():
+    '''Listeners can subscribe and unsubscribe while being notified'''
+
+    class A(object):
+        _foo = 0
+        foo = p.property_a('_foo', cn=True)
+
+    a = A()
+    calls = []
+
+    def late():
+        calls.append('late')
+
+    def first():
+        calls.append('first')
+        A.foo.unsubscribe(a, first)
+        A.foo.subscribe(a, late)
+
+    A.foo.subscribe(a, first)
+    A.foo.notify(a)
+    assert calls == ['first']
+    A.foo.notify(a)
+    assert calls == ['first', 'late']
+
+def test_event_dead_refs():
+    '''Collected listeners are dropped from the event jar'''
+
+    class Listener(object):
+        def __call__(self):
+            pass
+
+    event = p.Event()
+    listeners = [Listener() for _ in range(10)]
+    for listener in listeners:
+        event.add(listener)
+        event.add(listener)
+    assert len(event) == 10
+    assert len(event.snapshot()) == 10
+
+    del listeners[:6]
+    assert len(event) == 4
+    assert len(list(event)) == 4
+    assert len(event.snapshot()) == 4
+
+def test_delete_events():
+    '''Event storage can be deleted'''
+
+    class A(object):
+        foo = p.property_a('_foo', cn=True)
+
+    a = A()
+    A.foo.subscribe(a, mock.Mock())
+    del A.foo._event_storage[a]
+    assert A.foo._event_storage[a] is None
+
+
+def test_link():
+    '''Mirror a property onto several models'''
+
+    class A(object):
+        _foo = 1
+        foo = p.property_a('_foo', cn=True)
+
+    class B(object):
+        _bar = None
+        bar = p.property_a('_bar', cn=True)
+
+    a, b1, b2 = A(), B(), B()
+    link = s.link(a, 'foo', [(b1, B.bar), (b2, 'bar')], forward=str)
+
+    # The targets catch up right away
+    assert b1.bar == b2.bar == '1'
+
+    a.foo = 2
+    assert b1.bar == b2.bar == '2'
+
+    # One-way: target changes stay put
+    b1.bar = 'x'
+    assert a.foo == 2
+
+    link.unbind()
+    a.foo = 3
+    assert b2.bar == '2'
+
+def test_link_two_way():
+    '''Two-way links don't ping-pong, even with lossy converters'''
+
+    class A(object):
+        _foo = 0
+        foo = p.property_a('_foo', cn=True)
+
+    a, b, c = A(), A(), A()
+    cb = mock.Mock()
+    A.foo.subscribe(a, cb)
+
+    s.link(a, A.foo, [(b, A.foo), (c, A.foo)], two_way=True,
+           forward=lambda x: x * 10, back=lambda x: x // 10)
+    assert (a.foo, b.foo, c.foo) == (0, 0, 0)
+
+    b.foo = 42
+    assert (a.foo, b.foo, c.foo) == (4, 40, 40)
+    assert cb.call_count == 1
+
+def test_link_changed_by_listener():
+    '''Source changes made from a target's listener aren't lost'''
+
+    class A(object):
+        _foo = 0
+        foo = p.property_a('_foo', cn=True)
+
+    a, b = A(), A()
+    s.link(a, A.foo, [(b, A.foo)], two_way=True)
+
+    def reset(*args, **kwargs):
+        if b.foo == 1:
+            a.foo = 100
+    A.foo.subscribe(b, reset)
+
+    a.foo = 1
+    assert (a.foo, b.foo) == (100, 100)
+
+def test_link_two_way_suspended():
+    '''Changes on either side while suspended are caught up with on resume'''
+
+    class A(object):
+        _foo = 0
+        foo = p.property_a('_foo', cn=True)
+
+    a, b, c = A(), A(), A()
+    link = s.link(a, A.foo, [(b, A.foo), (c, A.foo)], two_way=True)
+
+    link.suspend()
+    b.foo = 5
+    assert a.foo == 0
+    link.resume()
+    assert (a.foo, b.foo, c.foo) == (5, 5, 5)
+
+    # The side that changed last wins
+    link.suspend()
+    b.foo = 6
+    a.foo = 7
+    link.resume()
+    assert (a.foo, b.foo, c.foo) == (7, 7, 7)
+
+    link.suspend()
+    a.foo = 8
+    c.foo = 9
+    link.resume()
+    assert (a.foo, b.foo, c.foo) == (9, 9, 9)
+
+def test_link_coalesce():
+    '''Coalesce source changes, pushing only the latest value'''
+
+    class A(object):
+        _foo = 0
+        foo = p.property_a('_foo', cn=True)
+
+    a, b = A(), A()
+    later = []
+    link = s.link(a, A.foo, [(b, A.foo)], defer=later.append)
+
+    a.foo = 1
+    a.foo = 2
+    a.foo = 3
+    assert b.foo == 0
+    assert later == [link.flush]
+
+    later.pop()()
+    assert b.foo == 3
+
+    link.suspend()
+    a.foo = 4
+    assert later == []
+    link.resume()
+    assert b.foo == 4
+
+def test_link_namespace():
+    '''Links don't take over attribute names of the source'''
+
+    class A(object):
+        _links = 0
+        links = p.property_a('_links', cn=True)
+
+    a, b = A(), A()
+    link = s.link(a, A.links, [(b, A.links)])
+    a.links = 5
+    assert (a.links, b.links) == (5, 5)
+    link.unbind()
+
+    class Slotted(object):
+        __slots__ = ['_foo', '_events_foo', '__weakref__']
+        foo = p.property_a('_foo', cn=True)
+
+    try:
+        s.link(Slotted(), Slotted.foo, [])
+    except TypeError:
+        pass
+    else:
+        assert False
+
+def test_link_needs_notification():
+    '''Links watch properties with change notification only'''
+
+    class A(object):
+        _foo = 0
+        foo = p.property_a('_foo')
+
+    try:
+        s.link(A(), 'foo', [])
+    except ValueError:
+        pass
+    else:
+        assert False
@@ -206,4 +206,94 @@ def test_enabled():
 	assert not view.text.isEnabled()
 
 
+
+@demoutil.pyside_test
+def test_bindings():
+	'''
+	`hookup_all` returns the bindings it made,
+	so a dialog can be reused for another model, paused while hidden, or let go.
+	'''
+
+	class Model(object):
+
+		def __init__(self, text):
+			self._text = text
+			self._switch = False
+
+		text   = pr.property_a('_text', cn=True)
+		switch = pr.property_a('_switch', cn=True)
+
+	first, second = Model('first'), Model('second')
+	view = example_view()
+	bindings = pyside.hookup_all(first, view)
+
+	assert len(bindings) == 2
+	assert view.text.text() == 'first'
+
+	# Point the same window at another model; the view refreshes right away
+
+	bindings.rebind(second)
+	assert view.text.text() == 'second'
+
+	first.text = 'not shown'
+	assert view.text.text() == 'second'
+
+	# While suspended, the view ignores the model, then catches up on resume
+
+	bindings.suspend()
+	second.text = 'later'
+	assert view.text.text() == 'second'
+	bindings.resume()
+	assert view.text.text() == 'later'
+
+	# Once unbound, the view and the model go separate ways
+
+	bindings.unbind()
+	second.text = 'gone'
+	assert view.text.text() == 'later'
+	view.switch.setChecked(True)
+	assert second.switch == False
+
+
+
+@demoutil.pyside_test
+def test_bindings_subscribe_only():
+	'''
+	Bindings also work with properties of your own that can subscribe,
+	but not unsubscribe.
+	'''
+
+	class SubscribeOnly(object):
+
+		def __init__(self, prop):
+			self.prop = prop
+
+		def __get__(self, obj, type=None):
+			return self.prop.__get__(obj, type)
+
+		def __set__(self, obj, value):
+			self.prop.__set__(obj, value)
+
+		def subscribe(self, obj, cb):
+			self.prop.subscribe(obj, cb)
+
+	class Model(object):
+
+		def __init__(self, text):
+			self._text = text
+
+		text = SubscribeOnly(pr.property_a('_text', cn=True))
+
+	first, second = Model('first'), Model('second')
+	view = example_view()
+	bindings = pyside.hookup_all(first, view)
+
+	bindings.rebind(second)
+	assert view.text.text() == 'second'
+
+	bindings.unbind()
+	second.text = 'gone'
+	assert view.text.text() == 'second'
+
+
 # demo : variants
\ No newline at end of file